@@ -1,23 +1,28 @@
-from fastapi import FastAPI
+import json
+
+from fastapi import FastAPI, Response
 from pydantic import BaseModel
 
 app = FastAPI()
 
+# Responses are constant, so serialize them once at import time
+_HEALTH_BODY = json.dumps({"status":"UP"}).encode()
+_INFER_BODY = json.dumps({
+    "model_version": "stub-0.1",
+    "labels": [
+        {"label":"aphids","confidence":0.82},
+        {"label":"leaf_spot","confidence":0.13},
+        {"label":"healthy","confidence":0.05}
+    ]
+}).encode()
+
 class InferReq(BaseModel):
     image_url: str | None = None
 
 @app.get("/health")
 def health():
-    return {"status":"UP"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 @app.post("/infer")
 def infer(req: InferReq):
-    return {
-        "model_version": "stub-0.1",
-        "labels": [
-            {"label":"aphids","confidence":0.82},
-            {"label":"leaf_spot","confidence":0.13},
-            {"label":"healthy","confidence":0.05}
-        ]
-    }
-
+    return Response(content=_INFER_BODY, media_type="application/json")
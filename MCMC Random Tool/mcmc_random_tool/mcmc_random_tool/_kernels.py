@@ -0,0 +1,116 @@
+"""Compiled sampling kernels, used when the optional numba extra is installed.
+
+This module imports numba unconditionally; model.py imports it lazily and
+falls back to NumPy when the import fails.
+"""
+
+import numpy as np
+from numba import njit, prange
+
+# Below this many chains the thread pool start-up and parallel compile time
+# outweigh the work, so the serial kernels are used
+PARALLEL_MIN_CHAINS = 4096
+
+
+@njit(cache=True)
+def _fill_chain(
+    cdf_trans: np.ndarray, cdf_start: np.ndarray, u: np.ndarray, out: np.ndarray, c: int
+) -> None:
+    """Fill row c of out from one cumulative transition matrix."""
+    # The path length stays a runtime loop bound: the loop is already
+    # compiled, so specializing it per length would only add compile time
+    out[c, 0] = np.searchsorted(cdf_start, u[c, 0], side="right")
+    for t in range(1, out.shape[1]):
+        out[c, t] = np.searchsorted(cdf_trans[out[c, t - 1]], u[c, t], side="right")
+
+
+@njit(cache=True)
+def _sample_paths_serial(
+    cdf_trans: np.ndarray, cdf_start: np.ndarray, u: np.ndarray, out: np.ndarray
+) -> None:
+    for c in range(out.shape[0]):
+        _fill_chain(cdf_trans, cdf_start, u, out, c)
+
+
+@njit(cache=True, parallel=True)
+def _sample_paths_parallel(
+    cdf_trans: np.ndarray, cdf_start: np.ndarray, u: np.ndarray, out: np.ndarray
+) -> None:
+    for c in prange(out.shape[0]):
+        _fill_chain(cdf_trans, cdf_start, u, out, c)
+
+
+@njit(cache=True)
+def _sample_paths_per_chain_serial(
+    cdf_trans: np.ndarray, cdf_start: np.ndarray, u: np.ndarray, out: np.ndarray
+) -> None:
+    for c in range(out.shape[0]):
+        _fill_chain(cdf_trans[c], cdf_start, u, out, c)
+
+
+@njit(cache=True, parallel=True)
+def _sample_paths_per_chain_parallel(
+    cdf_trans: np.ndarray, cdf_start: np.ndarray, u: np.ndarray, out: np.ndarray
+) -> None:
+    for c in prange(out.shape[0]):
+        _fill_chain(cdf_trans[c], cdf_start, u, out, c)
+
+
+def sample_paths(
+    cdf_trans: np.ndarray, cdf_start: np.ndarray, u: np.ndarray, out: np.ndarray
+) -> None:
+    """
+    Fill out with paths sampled by inverse-CDF lookup.
+
+    Args:
+        cdf_trans: Row-wise cumulative transition matrix with shape
+            (n_states, n_states), or one matrix per chain with shape
+            (n_chains, n_states, n_states)
+        cdf_start: Cumulative start state distribution (n_states,)
+        u: Uniform draws with shape (n_chains, length)
+        out: Output state indices with shape (n_chains, length)
+    """
+    parallel = out.shape[0] >= PARALLEL_MIN_CHAINS
+    if cdf_trans.ndim == 3:
+        kernel = _sample_paths_per_chain_parallel if parallel else _sample_paths_per_chain_serial
+    else:
+        kernel = _sample_paths_parallel if parallel else _sample_paths_serial
+    kernel(
+        np.ascontiguousarray(cdf_trans, dtype=np.float64),
+        np.ascontiguousarray(cdf_start, dtype=np.float64),
+        u,
+        out,
+    )
+
+
+@njit(cache=True)
+def _logprob_paths(
+    paths: np.ndarray, log_start: np.ndarray, log_trans: np.ndarray, out: np.ndarray
+) -> None:
+    for c in range(paths.shape[0]):
+        steps = 0.0
+        for t in range(1, paths.shape[1]):
+            steps += log_trans[paths[c, t - 1], paths[c, t]]
+        out[c] = log_start[paths[c, 0]] + steps
+
+
+def logprob_paths(paths: np.ndarray, log_start: np.ndarray, log_trans: np.ndarray) -> np.ndarray:
+    """
+    Compute log probabilities of paths from cached log matrices.
+
+    Args:
+        paths: Array of state indices with shape (n_paths, length)
+        log_start: Log start state probabilities (n_states,)
+        log_trans: Log transition matrix (n_states, n_states)
+
+    Returns:
+        Log probabilities with shape (n_paths,)
+    """
+    out = np.empty(paths.shape[0], dtype=np.float64)
+    _logprob_paths(
+        np.ascontiguousarray(paths, dtype=np.int64),
+        np.ascontiguousarray(log_start, dtype=np.float64),
+        np.ascontiguousarray(log_trans, dtype=np.float64),
+        out,
+    )
+    return out
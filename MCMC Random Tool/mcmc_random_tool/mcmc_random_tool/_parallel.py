@@ -0,0 +1,66 @@
+"""Run independent sampling work in chunks across worker processes."""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+
+
+def chunk_sizes(n_total: int, n_jobs: int) -> list[int]:
+    """
+    Split n_total items into at most n_jobs nearly equal, non-empty chunks.
+
+    Args:
+        n_total: Number of items to split
+        n_jobs: Number of chunks requested
+
+    Returns:
+        List of chunk sizes summing to n_total
+    """
+    base, extra = divmod(n_total, n_jobs)
+    sizes = [base + (1 if i < extra else 0) for i in range(n_jobs)]
+    return [size for size in sizes if size > 0]
+
+
+def map_chunks(
+    worker: Callable[..., T],
+    n_total: int,
+    n_jobs: int,
+    rng: np.random.Generator,
+    *args: Any
+) -> list[T]:
+    """
+    Run worker(*args, n_chunk, seed) for each chunk in a process pool.
+
+    Each chunk gets an independent random stream spawned from a single
+    SeedSequence drawn from rng, so results are reproducible for a given
+    seed and n_jobs. Workers are started with the "spawn" method: forking
+    a parent whose numba thread pool is already running can deadlock.
+
+    Args:
+        worker: Module-level (picklable) function taking the extra args,
+            the chunk size and a SeedSequence
+        n_total: Total number of samples across all chunks
+        n_jobs: Number of worker processes (must be >= 1)
+        rng: Random number generator used to derive the chunk seeds
+        *args: Leading arguments passed to every worker call
+
+    Returns:
+        Worker results in chunk order
+
+    Raises:
+        ValueError: If n_jobs < 1
+    """
+    if n_jobs < 1:
+        raise ValueError(f"Number of jobs must be positive, got {n_jobs}")
+
+    sizes = chunk_sizes(n_total, n_jobs)
+    seeds = np.random.SeedSequence(int(rng.integers(2**63))).spawn(len(sizes))
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=len(sizes), mp_context=context) as executor:
+        return list(executor.map(partial(worker, *args), sizes, seeds))
@@ -1,6 +1,7 @@
 """Command-line interface for MCMC Random Tool."""
 
 import argparse
+import csv
 import json
 import logging
 import sys
@@ -8,19 +9,14 @@ from collections import Counter
 from typing import Optional
 
 import numpy as np
-import pandas as pd
 
 from .io_utils import parse_sequences_from_file
 from .model import (
-    argmax_sequence,
-    build_transition_counts,
+    build_transition_counts_dense,
     empirical_start_distribution,
-    logprob_of_sequence,
-    sample_sequence,
-    transition_matrix_from_counts,
+    fit_chain,
 )
-from .posterior import posterior_predictive_sequences
-from .viz import plot_frequency, plot_heatmap
+from .posterior import posterior_predictive_from_counts
 
 logger = logging.getLogger(__name__)
 
@@ -35,8 +31,35 @@ def setup_logging(verbose: bool = False) -> None:
     )
 
 
+def write_ranking(path: str, header: list[str], rows: list[tuple]) -> None:
+    """Stream already-sorted ranking rows to a CSV file."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def format_ranking(header: list[str], rows: list[tuple]) -> str:
+    """Format ranking rows as a right-aligned plain-text table."""
+    cells = [header] + [
+        [f"{v:.6f}" if isinstance(v, float) else str(v) for v in row]
+        for row in rows
+    ]
+    widths = [max(len(line[col]) for line in cells) for col in range(len(header))]
+    return "\n".join(
+        "  ".join(cell.rjust(width) for cell, width in zip(line, widths))
+        for line in cells
+    )
+
+
 def cmd_analyze(args: argparse.Namespace) -> int:
     """Analyze sequences and generate visualizations."""
+    # pandas and matplotlib are slow to import, so only commands that need
+    # them pay for it
+    import pandas as pd
+
+    from .viz import plot_frequency, plot_heatmap
+
     try:
         sequences = parse_sequences_from_file(
             args.input,
@@ -48,9 +71,8 @@ def cmd_analyze(args: argparse.Namespace) -> int:
             logger.error("Need at least 2 sequences for analysis")
             return 1
 
-        counts, states = build_transition_counts(sequences)
-        trans = transition_matrix_from_counts(counts, states, alpha=args.alpha)
-        start_probs = empirical_start_distribution(sequences, states, alpha=args.alpha)
+        chain = fit_chain(sequences, alpha=args.alpha)
+        states, trans, start_probs = chain.states, chain.trans, chain.start_probs
 
         # Create frequency distribution
         all_numbers = [x for seq in sequences for x in seq]
@@ -99,10 +121,7 @@ def cmd_predict(args: argparse.Namespace) -> int:
             logger.error("Need at least 2 sequences for prediction")
             return 1
 
-        counts, states = build_transition_counts(sequences)
-        trans = transition_matrix_from_counts(counts, states, alpha=args.alpha)
-        start_probs = empirical_start_distribution(sequences, states, alpha=args.alpha)
-
+        chain = fit_chain(sequences, alpha=args.alpha)
         rng = np.random.default_rng(args.seed)
 
         # Generate argmax sequences from top starting states
@@ -112,19 +131,18 @@ def cmd_predict(args: argparse.Namespace) -> int:
 
         for start_state in top_starts:
             try:
-                seq = argmax_sequence(start_state, states, trans, length=args.length)
+                seq = chain.argmax_sequence(start_state, length=args.length)
                 argmax_out.append(seq)
             except ValueError as e:
                 logger.warning(f"Could not generate argmax sequence for start state {start_state}: {e}")
 
         # Generate sampled sequences
         sampled = []
-        for _ in range(args.k):
-            try:
-                seq = sample_sequence(states, start_probs, trans, length=args.length, rng=rng)
-                sampled.append(seq)
-            except Exception as e:
-                logger.warning(f"Could not sample sequence: {e}")
+        try:
+            paths = chain.sample_paths(args.k, args.length, rng)
+            sampled = chain.states_arr[paths].tolist()
+        except ValueError as e:
+            logger.warning(f"Could not sample sequences: {e}")
 
         result = {
             "argmax_sequences": argmax_out,
@@ -151,52 +169,36 @@ def cmd_topk(args: argparse.Namespace) -> int:
             logger.error("Need at least 2 sequences for top-k analysis")
             return 1
 
-        counts, states = build_transition_counts(sequences)
-        trans = transition_matrix_from_counts(counts, states, alpha=args.alpha)
-        start_probs = empirical_start_distribution(sequences, states, alpha=args.alpha)
-
+        chain = fit_chain(sequences, alpha=args.alpha)
         rng = np.random.default_rng(args.seed)
-        samples = []
 
-        for i in range(args.n):
-            try:
-                seq = sample_sequence(states, start_probs, trans, length=args.length, rng=rng)
-                lp = logprob_of_sequence(seq, states, start_probs, trans)
-                samples.append((" ".join(map(str, seq)), lp))
+        paths = chain.sample_paths(args.n, args.length, rng, n_jobs=args.jobs)
+        lps = chain.logprob_of_paths(paths)
+        logger.info(f"Generated {args.n} samples")
 
-                if (i + 1) % 100 == 0:
-                    logger.info(f"Generated {i + 1}/{args.n} samples")
+        # Count unique paths, keeping the log probability of each
+        path_counts: Counter[tuple[int, ...]] = Counter()
+        path_to_lp: dict[tuple[int, ...], float] = {}
 
-            except Exception as e:
-                logger.warning(f"Could not sample sequence {i}: {e}")
+        for path, lp in zip(paths.tolist(), lps.tolist()):
+            key = tuple(path)
+            path_counts[key] += 1
+            path_to_lp.setdefault(key, lp)
 
-        # Count unique sequences
-        c = Counter([s for s, _ in samples])
         rows = []
+        for key, cnt in path_counts.items():
+            seq_lp = path_to_lp[key]
+            seq_str = " ".join(str(chain.states[i]) for i in key)
+            prob = float(np.exp(seq_lp)) if np.isfinite(seq_lp) else 0.0
+            rows.append((seq_str, cnt, seq_lp, prob))
 
-        for seq_str, cnt in c.items():
-            # Find log probability for this sequence
-            seq_lp: Optional[float] = None
-            for s2, lp2 in samples:
-                if s2 == seq_str:
-                    seq_lp = lp2
-                    break
-
-            rows.append({
-                "sequence": seq_str,
-                "count_in_samples": cnt,
-                "log_prob": seq_lp,
-                "probability": float(np.exp(seq_lp)) if seq_lp is not None and np.isfinite(seq_lp) else 0.0
-            })
-
-        df = pd.DataFrame(rows).sort_values(
-            ["probability", "count_in_samples"],
-            ascending=[False, False]
-        )
-        df.to_csv(args.out, index=False)
+        # Most probable first, ties broken by sample count
+        rows.sort(key=lambda row: (-row[3], -row[1]))
+        header = ["sequence", "count_in_samples", "log_prob", "probability"]
+        write_ranking(args.out, header, rows)
 
         logger.info(f"Top-k ranking saved to {args.out}")
-        print(df.head(args.k).to_string(index=False))
+        print(format_ranking(header, rows[:args.k]))
         return 0
 
     except Exception as e:
@@ -217,39 +219,39 @@ def cmd_posterior(args: argparse.Namespace) -> int:
             logger.error("Need at least 2 sequences for posterior analysis")
             return 1
 
-        counts, states = build_transition_counts(sequences)
+        counts_dense, states = build_transition_counts_dense(sequences)
         start_probs = empirical_start_distribution(sequences, states, alpha=args.alpha)
         rng = np.random.default_rng(args.seed)
 
-        sims = posterior_predictive_sequences(
-            sequences, states, start_probs,
+        result = posterior_predictive_from_counts(
+            counts_dense, states, start_probs,
             alpha=args.alpha, length=args.length,
-            nsamples=args.nsamples, rng=rng
+            nsamples=args.nsamples, rng=rng, n_jobs=args.jobs, as_list=False
+        )
+        assert isinstance(result, tuple)
+        seqs, lps = result
+
+        # Group identical sequences, keeping them in order of first appearance
+        uniq, first_idx, inverse, counts = np.unique(
+            seqs, axis=0, return_index=True, return_inverse=True, return_counts=True
         )
+        by_group = np.argsort(inverse.ravel(), kind="stable")
+        group_lps = np.split(lps[by_group], np.cumsum(counts)[:-1])
 
-        # Count unique sequences
-        seqs = [" ".join(map(str, s)) for s, _ in sims]
-        c = Counter(seqs)
         rows = []
+        for g in np.argsort(first_idx).tolist():
+            mean_lp = float(np.mean(group_lps[g]))
+            seq_str = " ".join(map(str, uniq[g].tolist()))
+            mean_prob = float(np.exp(mean_lp)) if np.isfinite(mean_lp) else 0.0
+            rows.append((seq_str, int(counts[g]), mean_lp, mean_prob))
 
-        for seq_str, cnt in c.items():
-            lps = [lp for (s, lp) in sims if " ".join(map(str, s)) == seq_str]
-            mean_lp = float(np.mean(lps)) if len(lps) > 0 else float("-inf")
-            rows.append({
-                "sequence": seq_str,
-                "count_in_nsamples": cnt,
-                "mean_log_prob": mean_lp,
-                "mean_prob": float(np.exp(mean_lp)) if np.isfinite(mean_lp) else 0.0
-            })
-
-        df = pd.DataFrame(rows).sort_values(
-            ["mean_prob", "count_in_nsamples"],
-            ascending=[False, False]
-        )
-        df.to_csv(args.out, index=False)
+        # Most probable first, ties broken by sample count
+        rows.sort(key=lambda row: (-row[3], -row[1]))
+        header = ["sequence", "count_in_nsamples", "mean_log_prob", "mean_prob"]
+        write_ranking(args.out, header, rows)
 
         logger.info(f"Posterior predictive ranking saved to {args.out}")
-        print(df.head(args.k).to_string(index=False))
+        print(format_ranking(header, rows[:args.k]))
         return 0
 
     except Exception as e:
@@ -375,6 +377,10 @@ Examples:
         "--seed", type=int, default=123,
         help="Random seed (default: 123)"
     )
+    sp.add_argument(
+        "--jobs", type=int, default=1,
+        help="Number of worker processes for sampling (default: 1)"
+    )
 
     # Posterior command
     sp = sub.add_parser(
@@ -409,6 +415,10 @@ Examples:
         "--seed", type=int, default=2025,
         help="Random seed (default: 2025)"
     )
+    sp.add_argument(
+        "--jobs", type=int, default=1,
+        help="Number of worker processes for sampling (default: 1)"
+    )
 
     return p
 
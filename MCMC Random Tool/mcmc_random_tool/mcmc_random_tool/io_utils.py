@@ -1,11 +1,15 @@
 """Input/output utilities for parsing sequence files."""
 
 import logging
-import re
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Commas are treated like whitespace, so str.split() handles both delimiters.
+# Tokens are validated whole rather than scanned for digit runs, so "12abc"
+# is rejected instead of read as 12
+_DELIM_TABLE = str.maketrans(",", " ")
+
 
 def parse_sequences_from_file(
     path: str,
@@ -47,24 +51,25 @@ def parse_sequences_from_file(
     try:
         with open(file_path, encoding='utf-8') as f:
             for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if not line:
+                tokens = line.translate(_DELIM_TABLE).split()
+                if not tokens:
                     continue
 
-                tokens = re.split(r"[,\s]+", line)
                 seq: list[int] = []
 
                 for token in tokens:
-                    try:
-                        value = int(token)
-                        if valid_min <= value <= valid_max:
-                            seq.append(value)
-                        else:
-                            out_of_range += 1
-                            logger.debug(f"Line {line_num}: Value {value} out of range [{valid_min}, {valid_max}]")
-                    except ValueError:
+                    digits = token[1:] if token[0] in "+-" else token
+                    if not digits.isdecimal():
                         invalid_tokens += 1
                         logger.debug(f"Line {line_num}: Invalid token '{token}'")
+                        continue
+
+                    value = int(token)
+                    if valid_min <= value <= valid_max:
+                        seq.append(value)
+                    else:
+                        out_of_range += 1
+                        logger.debug(f"Line {line_num}: Value {value} out of range [{valid_min}, {valid_max}]")
 
                 if len(seq) >= 2:  # Only keep sequences with at least 2 states
                     sequences.append(seq)
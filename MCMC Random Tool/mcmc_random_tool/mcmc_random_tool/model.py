@@ -2,12 +2,41 @@
 
 import logging
 from collections import Counter, defaultdict
-from typing import Optional
+from dataclasses import dataclass
+from functools import cache
+from itertools import chain
+from types import ModuleType
+from typing import Optional, Union
 
 import numpy as np
 
+from ._parallel import map_chunks
+
 logger = logging.getLogger(__name__)
 
+# Probability invariants (non-negative, rows sum to 1) hold by construction.
+# Set to True to re-check them on every build, e.g. while debugging.
+VALIDATE = False
+
+
+def check_stochastic(probs: np.ndarray, name: str = "probabilities") -> None:
+    """
+    Check that probabilities are non-negative and sum to 1 along the last axis.
+
+    The check only runs when VALIDATE is set and Python is not running
+    with -O, so it stays off the sampling hot paths by default.
+
+    Args:
+        probs: Probability vector or row-stochastic matrix
+        name: Description used in assertion messages
+
+    Raises:
+        AssertionError: If validation is enabled and an invariant is violated
+    """
+    if __debug__ and VALIDATE:
+        assert np.all(probs >= 0), f"Negative {name} found"
+        assert np.allclose(probs.sum(axis=-1), 1.0), f"Rows of {name} do not sum to 1"
+
 
 def build_transition_counts(
     sequences: list[list[int]]
@@ -15,6 +44,9 @@ def build_transition_counts(
     """
     Build transition count matrix from sequences.
 
+    Counts are accumulated densely by build_transition_counts_dense and
+    returned as a dict of Counters for callers that index counts[a][b].
+
     Args:
         sequences: List of sequences, where each sequence is a list of integers
 
@@ -22,32 +54,141 @@ def build_transition_counts(
         Tuple of (counts_dict, sorted_states) where counts_dict maps
         state -> Counter of next states, and sorted_states is sorted list of states
 
+    Raises:
+        ValueError: If no sequences provided
+    """
+    counts_dense, states = build_transition_counts_dense(sequences)
+    return transition_counts_dict(counts_dense, states), states
+
+
+def build_transition_counts_dense(
+    sequences: list[list[int]]
+) -> tuple[np.ndarray, list[int]]:
+    """
+    Build a dense transition count matrix from sequences.
+
+    Sequences are packed into a padded array once and transitions are
+    counted with one np.bincount, without building any per-state Counters.
+
+    Args:
+        sequences: List of sequences, where each sequence is a list of integers
+
+    Returns:
+        Tuple of (counts_dense, sorted_states) where counts_dense is an int64
+        matrix with shape (n_states, n_states) ordered as in sorted_states
+
     Raises:
         ValueError: If no sequences provided
     """
     if not sequences:
         raise ValueError("No sequences provided")
 
-    counts: dict[int, Counter] = defaultdict(Counter)
-    states: set[int] = set()
+    counts_dense, states = _counts_from_padded_array(*pad_sequences(sequences))
 
-    for seq in sequences:
-        if len(seq) < 2:
-            continue
+    logger.info(f"Built transition counts for {len(states)} states from {len(sequences)} sequences")
+    return counts_dense, states
+
+
+def pad_sequences(sequences: list[list[int]]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Pack variable-length sequences into one contiguous array.
 
-        for i in range(len(seq) - 1):
-            current_state = seq[i]
-            next_state = seq[i + 1]
-            counts[current_state][next_state] += 1
-            states.add(current_state)
-            states.add(next_state)
+    Args:
+        sequences: List of sequences, where each sequence is a list of integers
 
-    if not states:
+    Returns:
+        Tuple of (seqs_arr, lengths) where seqs_arr is an int32 array with
+        shape (n_sequences, max_length) padded with -1, and lengths holds
+        each sequence's length
+    """
+    lengths = np.fromiter(map(len, sequences), dtype=np.int64, count=len(sequences))
+    max_len = int(lengths.max()) if len(sequences) else 0
+    seqs_arr = np.full((len(sequences), max_len), -1, dtype=np.int32)
+    seqs_arr[np.arange(max_len) < lengths[:, None]] = np.fromiter(
+        chain.from_iterable(sequences), dtype=np.int32, count=int(lengths.sum())
+    )
+    return seqs_arr, lengths
+
+
+def _counts_from_padded_array(
+    seqs_arr: np.ndarray,
+    lengths: np.ndarray
+) -> tuple[np.ndarray, list[int]]:
+    """Count transitions in a padded sequence array (see pad_sequences)."""
+    # Column t starts a transition when t + 1 is still inside the sequence;
+    # masking by length rather than by the pad value keeps negative states
+    is_pair = np.arange(seqs_arr.shape[1] - 1) < lengths[:, None] - 1
+    src = seqs_arr[:, :-1][is_pair]
+    dst = seqs_arr[:, 1:][is_pair]
+
+    if src.size == 0:
         raise ValueError("No valid states found in sequences")
 
-    sorted_states = sorted(states)
-    logger.info(f"Built transition counts for {len(sorted_states)} states from {len(sequences)} sequences")
-    return counts, sorted_states
+    states_arr = np.unique(np.concatenate([src, dst]))
+    n = len(states_arr)
+    flat_idx = np.searchsorted(states_arr, src).astype(np.int64) * n + np.searchsorted(states_arr, dst)
+    counts_dense = np.bincount(flat_idx, minlength=n * n).astype(np.int64).reshape(n, n)
+    return counts_dense, states_arr.tolist()
+
+
+def transition_counts_dict(
+    counts_dense: np.ndarray,
+    states: list[int]
+) -> dict[int, Counter]:
+    """
+    View a dense count matrix as a dict of Counters.
+
+    Args:
+        counts_dense: Transition count matrix with shape (n_states, n_states)
+        states: List of state values
+
+    Returns:
+        Dict mapping state -> Counter of next states, holding only the
+        observed transitions
+    """
+    counts: dict[int, Counter] = defaultdict(Counter)
+    for i, j in zip(*np.nonzero(counts_dense)):
+        counts[states[i]][states[j]] = int(counts_dense[i, j])
+    return counts
+
+
+def dense_transition_counts(
+    counts: dict[int, Counter],
+    states: list[int]
+) -> np.ndarray:
+    """
+    Scatter transition counts into a dense matrix.
+
+    Args:
+        counts: Transition counts dictionary
+        states: List of state values
+
+    Returns:
+        Count matrix with shape (n_states, n_states), rows and columns
+        ordered as in states
+    """
+    n = len(states)
+    state_to_idx = {state: i for i, state in enumerate(states)}
+
+    # Flatten observed transitions into index/count arrays
+    rows: list[int] = []
+    cols: list[int] = []
+    cnts: list[int] = []
+    for state, state_counts in counts.items():
+        if state not in state_to_idx:
+            continue
+        i = state_to_idx[state]
+        for next_state, count in state_counts.items():
+            if next_state in state_to_idx:
+                rows.append(i)
+                cols.append(state_to_idx[next_state])
+                cnts.append(count)
+            else:
+                logger.warning(f"Next state {next_state} not in states list")
+
+    dense = np.zeros((n, n), dtype=np.float64)
+    np.add.at(dense, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)), cnts)
+    return dense
 
 
 def transition_matrix_from_counts(
@@ -66,40 +207,37 @@ def transition_matrix_from_counts(
     Returns:
         Transition matrix with shape (n_states, n_states)
 
+    Raises:
+        ValueError: If alpha <= 0
+    """
+    return transition_matrix_from_dense(dense_transition_counts(counts, states), alpha=alpha)
+
+
+def transition_matrix_from_dense(
+    counts_dense: np.ndarray,
+    alpha: float = 1.0
+) -> np.ndarray:
+    """
+    Build smoothed transition matrix from a dense count matrix.
+
+    Args:
+        counts_dense: Transition count matrix with shape (n_states, n_states)
+        alpha: Dirichlet smoothing parameter (must be > 0)
+
+    Returns:
+        Transition matrix with shape (n_states, n_states)
+
     Raises:
         ValueError: If alpha <= 0
     """
     if alpha <= 0:
         raise ValueError(f"Alpha must be positive, got {alpha}")
 
-    n = len(states)
-    state_to_idx = {state: i for i, state in enumerate(states)}
-    matrix = np.zeros((n, n), dtype=np.float64)
-
-    for i, state in enumerate(states):
-        if state in counts:
-            # Get counts for this state
-            state_counts = counts[state]
-            total = sum(state_counts.values()) + alpha * n
-
-            for next_state, count in state_counts.items():
-                if next_state in state_to_idx:
-                    j = state_to_idx[next_state]
-                    matrix[i, j] = (count + alpha) / total
-                else:
-                    logger.warning(f"Next state {next_state} not in states list")
-
-            # Fill in missing transitions with alpha smoothing
-            for j in range(n):
-                if matrix[i, j] == 0:
-                    matrix[i, j] = alpha / total
-        else:
-            # No transitions from this state, use uniform distribution
-            matrix[i, :] = 1.0 / n
-
-    # Ensure numeric stability
-    assert np.all(matrix >= 0), "Negative probabilities found"
-    assert np.allclose(matrix.sum(axis=1), 1.0), "Rows do not sum to 1"
+    # Smooth every cell, then normalize each row.
+    # Rows without observed transitions normalize to uniform.
+    matrix = counts_dense + float(alpha)
+    matrix /= matrix.sum(axis=1, keepdims=True)
+    check_stochastic(matrix, "transition probabilities")
 
     logger.info(f"Built transition matrix with alpha={alpha}")
     return matrix
@@ -131,21 +269,21 @@ def empirical_start_distribution(
         raise ValueError("No sequences provided")
 
     n = len(states)
-    state_to_idx = {state: i for i, state in enumerate(states)}
-    start_counts = np.zeros(n, dtype=np.float64)
+    states_arr = np.asarray(states, dtype=np.int64)
+    order = np.argsort(states_arr)
+    sorted_states = states_arr[order]
 
-    for seq in sequences:
-        if seq:
-            first_state = seq[0]
-            if first_state in state_to_idx:
-                start_counts[state_to_idx[first_state]] += 1
+    # Locate each first state; sequences starting outside states are skipped
+    first_states = np.fromiter((seq[0] for seq in sequences if seq), dtype=np.int64)
+    pos = np.searchsorted(sorted_states, first_states)
+    known = pos < n
+    known[known] = sorted_states[pos[known]] == first_states[known]
+    start_counts = np.bincount(order[pos[known]], minlength=n).astype(np.float64)
 
     # Apply Dirichlet smoothing
-    probs = (start_counts + alpha) / (start_counts.sum() + alpha * n)
+    probs: np.ndarray = (start_counts + alpha) / (start_counts.sum() + alpha * n)
 
-    # Ensure numeric stability
-    assert np.all(probs >= 0), "Negative start probabilities found"
-    assert np.isclose(probs.sum(), 1.0), "Start probabilities do not sum to 1"
+    check_stochastic(probs, "start probabilities")
 
     logger.info(f"Built start distribution with alpha={alpha}")
     return probs
@@ -179,17 +317,217 @@ def argmax_sequence(
     if start_state not in state_to_idx:
         raise ValueError(f"Start state {start_state} not found in states")
 
-    sequence = [start_state]
-    current_state = start_state
+    path = argmax_path(np.argmax(trans_mat, axis=1), state_to_idx[start_state], length)
+    return [states[i] for i in path]
+
+
+def argmax_path(next_idx_of: np.ndarray, start_idx: int, length: int) -> list[int]:
+    """
+    Follow the most likely transition from a start index.
+
+    Args:
+        next_idx_of: Most likely next state index for every state index,
+            i.e. the row-wise argmax of the transition matrix
+        start_idx: Starting state index
+        length: Path length
+
+    Returns:
+        List of state indices with the given length
+    """
+    successors = next_idx_of.tolist()
+    path = [start_idx]
+    first_seen = {start_idx: 0}
+    while len(path) < length:
+        next_idx = successors[path[-1]]
+        if next_idx in first_seen:
+            # The walk is deterministic, so it repeats this cycle forever;
+            # fill the rest of the path by repeating the cycle
+            cycle = path[first_seen[next_idx]:]
+            remaining = length - len(path)
+            path.extend((cycle * (remaining // len(cycle) + 1))[:remaining])
+            break
+        first_seen[next_idx] = len(path)
+        path.append(next_idx)
+    return path
+
+
+def cumulative_distribution(
+    probs: np.ndarray,
+    out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Build cumulative distributions along the last axis for inverse-CDF sampling.
+
+    The final entry of every row is pinned to 1.0 so that floating-point drift
+    in the cumulative sum can never push a uniform draw past the last state.
+
+    Args:
+        probs: Probability vector or row-stochastic matrix
+        out: Optional array of the same shape to write the result into
+
+    Returns:
+        Array of the same shape holding the cumulative probabilities
+    """
+    cdf = np.cumsum(probs, axis=-1, out=out)
+    cdf[..., -1] = 1.0
+    return cdf
 
-    for _ in range(length - 1):
-        current_idx = state_to_idx[current_state]
-        next_idx = np.argmax(trans_mat[current_idx])
-        next_state = states[next_idx]
-        sequence.append(next_state)
-        current_state = next_state
 
-    return sequence
+def log_probabilities(probs: np.ndarray) -> np.ndarray:
+    """
+    Take the elementwise log of probabilities, mapping zeros to -inf.
+
+    Args:
+        probs: Probability array of any shape
+
+    Returns:
+        Log probabilities with the same shape
+    """
+    logs: np.ndarray = np.log(probs, where=probs > 0, out=np.full(probs.shape, -np.inf))
+    return logs
+
+
+def sample_path(
+    cdf_trans: np.ndarray,
+    cdf_start: np.ndarray,
+    length: int,
+    rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Sample a path of state indices from precomputed CDFs.
+
+    Args:
+        cdf_trans: Row-wise cumulative transition matrix
+        cdf_start: Cumulative start state distribution
+        length: Path length (must be >= 1)
+        rng: Random number generator
+
+    Returns:
+        Array of state indices with shape (length,)
+    """
+    u = rng.random(length)
+    path = np.empty(length, dtype=np.int64)
+    path[0] = np.searchsorted(cdf_start, u[0], side="right")
+    for t in range(1, length):
+        path[t] = np.searchsorted(cdf_trans[path[t - 1]], u[t], side="right")
+    return path
+
+
+@cache
+def _numba_kernels() -> Optional[ModuleType]:
+    """Import the compiled kernels on first use, or None if numba is missing."""
+    try:
+        from . import _kernels
+    except ImportError:
+        return None
+    return _kernels
+
+
+def sample_sequences_batch(
+    n_chains: int,
+    cdf_trans: np.ndarray,
+    cdf_start: np.ndarray,
+    length: int,
+    rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Sample many independent paths of state indices in one vectorized pass.
+
+    Uses the compiled kernels when numba is installed; otherwise all chains
+    advance together so the Python-level loop runs over the path length
+    rather than over the number of chains. Either way, uniform draws are
+    consumed in the same order as repeated calls to sample_path.
+
+    Args:
+        n_chains: Number of paths to sample
+        cdf_trans: Row-wise cumulative transition matrix with shape
+            (n_states, n_states), or one matrix per chain with shape
+            (n_chains, n_states, n_states)
+        cdf_start: Cumulative start state distribution
+        length: Path length
+        rng: Random number generator
+
+    Returns:
+        Array of state indices with shape (n_chains, length)
+
+    Raises:
+        ValueError: If n_chains < 1 or length < 1
+    """
+    if n_chains < 1:
+        raise ValueError(f"Number of chains must be positive, got {n_chains}")
+
+    if length < 1:
+        raise ValueError(f"Length must be positive, got {length}")
+
+    return sample_paths_from_uniforms(cdf_trans, cdf_start, rng.random((n_chains, length)))
+
+
+def sample_paths_from_uniforms(
+    cdf_trans: np.ndarray,
+    cdf_start: np.ndarray,
+    u: np.ndarray
+) -> np.ndarray:
+    """
+    Turn pre-drawn uniforms into paths of state indices by inverse-CDF lookup.
+
+    Args:
+        cdf_trans: Row-wise cumulative transition matrix with shape
+            (n_states, n_states), or one matrix per chain with shape
+            (n_chains, n_states, n_states)
+        cdf_start: Cumulative start state distribution
+        u: Uniform draws in [0, 1) with shape (n_chains, length)
+
+    Returns:
+        Array of state indices with shape (n_chains, length)
+    """
+    n_chains, length = u.shape
+    paths = np.empty((n_chains, length), dtype=np.int64)
+
+    kernels = _numba_kernels()
+    if kernels is not None:
+        kernels.sample_paths(cdf_trans, cdf_start, u, paths)
+        return paths
+
+    chain_idx = np.arange(n_chains)
+    paths[:, 0] = np.searchsorted(cdf_start, u[:, 0], side="right")
+    for t in range(1, length):
+        if cdf_trans.ndim == 3:
+            rows = cdf_trans[chain_idx, paths[:, t - 1]]
+        else:
+            rows = cdf_trans[paths[:, t - 1]]
+        # First column whose cumulative probability exceeds the draw
+        paths[:, t] = (rows > u[:, t, None]).argmax(axis=1)
+    return paths
+
+
+def logprob_of_paths(
+    paths: np.ndarray,
+    start_probs: np.ndarray,
+    trans_mat: np.ndarray
+) -> np.ndarray:
+    """
+    Compute log probabilities of paths of state indices.
+
+    Args:
+        paths: Array of state indices with shape (n_paths, length)
+        start_probs: Start state probabilities
+        trans_mat: Transition matrix with shape (n_states, n_states), or one
+            matrix per path with shape (n_paths, n_states, n_states)
+
+    Returns:
+        Log probabilities with shape (n_paths,)
+    """
+    if trans_mat.ndim == 3:
+        path_idx = np.arange(len(paths))[:, None]
+        steps = trans_mat[path_idx, paths[:, :-1], paths[:, 1:]]
+    else:
+        steps = trans_mat[paths[:, :-1], paths[:, 1:]]
+
+    with np.errstate(divide="ignore"):
+        log_start = np.log(start_probs[paths[:, 0]])
+        log_steps = np.log(steps)
+    result: np.ndarray = log_start + log_steps.sum(axis=1)
+    return result
 
 
 def sample_sequence(
@@ -225,20 +563,21 @@ def sample_sequence(
     if len(start_probs) != n or trans_mat.shape != (n, n):
         raise ValueError(f"Transition matrix shape {trans_mat.shape} != ({n}, {n})")
 
-    idx_to_state = dict(enumerate(states))
-
-    # Sample start state
-    start_idx = rng.choice(n, p=start_probs)
-    sequence = [idx_to_state[start_idx]]
-
-    # Sample remaining states
-    current_idx = start_idx
-    for _ in range(length - 1):
-        next_idx = rng.choice(n, p=trans_mat[current_idx])
-        sequence.append(idx_to_state[next_idx])
-        current_idx = next_idx
+    # Inverse-CDF sampling silently accepts unnormalized rows, so check once
+    # up front what rng.choice used to check on every step
+    if np.any(start_probs < 0) or np.any(trans_mat < 0):
+        raise ValueError("Probabilities must be non-negative")
+    if not np.isclose(start_probs.sum(), 1.0) or not np.allclose(trans_mat.sum(axis=1), 1.0):
+        raise ValueError("Probabilities do not sum to 1")
 
-    return sequence
+    # A batch of one runs in the compiled kernel when numba is installed and
+    # consumes the same uniforms as sample_path
+    path = sample_paths_from_uniforms(
+        cumulative_distribution(trans_mat),
+        cumulative_distribution(start_probs),
+        rng.random((1, length))
+    )[0]
+    return [states[i] for i in path]
 
 
 def logprob_of_sequence(
@@ -262,21 +601,248 @@ def logprob_of_sequence(
     if not seq:
         return 0.0
 
-    state_to_idx = {state: i for i, state in enumerate(states)}
+    states_arr = np.asarray(states, dtype=np.int64)
+    order = np.argsort(states_arr)
+    seq_arr = np.asarray(seq, dtype=np.int64)
 
-    # Check if all states in sequence are valid
-    for state in seq:
-        if state not in state_to_idx:
+    # Locate every state at once; any out-of-vocabulary state short-circuits
+    # before a single log is taken
+    pos = np.searchsorted(states_arr, seq_arr, sorter=order)
+    if np.any(pos >= len(states_arr)) or np.any(states_arr[order[pos]] != seq_arr):
+        return -np.inf
+
+    idx = order[pos]
+    return float(logprob_of_paths(idx[None, :], start_probs, trans_mat)[0])
+
+
+def _sample_paths_chunk(
+    cdf_trans: np.ndarray,
+    cdf_start: np.ndarray,
+    length: int,
+    n_chains: int,
+    seed: np.random.SeedSequence
+) -> np.ndarray:
+    """Worker-process entry point for sample_sequences_batch."""
+    return sample_sequences_batch(
+        n_chains, cdf_trans, cdf_start, length, np.random.default_rng(seed)
+    )
+
+
+@dataclass(frozen=True, eq=False)
+class FittedChain:
+    """
+    Fitted Markov chain with the derived arrays used by samplers.
+
+    Building this once per command avoids recomputing the state index,
+    cumulative distributions and log probabilities on every call.
+    """
+
+    states: list[int]
+    states_arr: np.ndarray
+    state_to_idx: dict[int, int]
+    idx_lut: np.ndarray
+    lut_offset: int
+    trans: np.ndarray
+    start_probs: np.ndarray
+    cdf_trans: np.ndarray
+    cdf_start: np.ndarray
+    log_trans: np.ndarray
+    log_start: np.ndarray
+    next_idx_of: np.ndarray
+
+    @classmethod
+    def from_matrices(
+        cls,
+        states: list[int],
+        trans: np.ndarray,
+        start_probs: np.ndarray
+    ) -> "FittedChain":
+        """
+        Build a fitted chain from a transition matrix and start distribution.
+
+        Args:
+            states: List of state values
+            trans: Transition matrix
+            start_probs: Start state probabilities
+
+        Returns:
+            FittedChain with all derived arrays precomputed
+
+        Raises:
+            ValueError: If matrix shapes do not match the number of states
+        """
+        n = len(states)
+        if len(start_probs) != n or trans.shape != (n, n):
+            raise ValueError(f"Transition matrix shape {trans.shape} != ({n}, {n})")
+
+        # Direct-address table from state value to index (-1 if absent),
+        # covering the range between the smallest and largest state
+        states_arr = np.asarray(states, dtype=np.int64)
+        lut_offset = int(states_arr.min()) if n else 0
+        lut_size = int(states_arr.max()) - lut_offset + 1 if n else 0
+        idx_lut = np.full(lut_size, -1, dtype=np.int64)
+        idx_lut[states_arr - lut_offset] = np.arange(n)
+
+        return cls(
+            states=list(states),
+            states_arr=states_arr,
+            state_to_idx={state: i for i, state in enumerate(states)},
+            idx_lut=idx_lut,
+            lut_offset=lut_offset,
+            trans=trans,
+            start_probs=start_probs,
+            cdf_trans=cumulative_distribution(trans),
+            cdf_start=cumulative_distribution(start_probs),
+            log_trans=log_probabilities(trans),
+            log_start=log_probabilities(start_probs),
+            next_idx_of=np.argmax(trans, axis=1),
+        )
+
+    def sample_paths(
+        self,
+        n_chains: int,
+        length: int,
+        rng: np.random.Generator,
+        n_jobs: int = 1
+    ) -> np.ndarray:
+        """
+        Sample paths of state indices from the fitted chain.
+
+        With n_jobs > 1 the chains are split across worker processes, each
+        with its own seed spawned from rng; n_jobs=1 samples in-process.
+
+        Args:
+            n_chains: Number of paths to sample
+            length: Path length
+            rng: Random number generator
+            n_jobs: Number of worker processes
+
+        Returns:
+            Array of state indices with shape (n_chains, length)
+
+        Raises:
+            ValueError: If n_chains < 1, length < 1 or n_jobs < 1
+        """
+        if n_jobs == 1:
+            return sample_sequences_batch(n_chains, self.cdf_trans, self.cdf_start, length, rng)
+
+        if n_chains < 1:
+            raise ValueError(f"Number of chains must be positive, got {n_chains}")
+
+        if length < 1:
+            raise ValueError(f"Length must be positive, got {length}")
+
+        return np.concatenate(map_chunks(
+            _sample_paths_chunk, n_chains, n_jobs, rng,
+            self.cdf_trans, self.cdf_start, length
+        ))
+
+    def logprob_of_paths(self, paths: np.ndarray) -> np.ndarray:
+        """
+        Compute log probabilities of paths of state indices.
+
+        Args:
+            paths: Array of state indices with shape (n_paths, length)
+
+        Returns:
+            Log probabilities with shape (n_paths,)
+        """
+        lps: np.ndarray
+        kernels = _numba_kernels()
+        if kernels is not None:
+            lps = kernels.logprob_paths(paths, self.log_start, self.log_trans)
+        else:
+            steps = self.log_trans[paths[:, :-1], paths[:, 1:]].sum(axis=1)
+            lps = self.log_start[paths[:, 0]] + steps
+        return lps
+
+    def logprob_of_sequence(self, seq: list[int]) -> float:
+        """
+        Compute log probability of a sequence of state values.
+
+        Args:
+            seq: Sequence to evaluate
+
+        Returns:
+            Log probability (may be -inf for impossible sequences)
+        """
+        if not seq:
+            return 0.0
+
+        idx = self.to_indices(seq)
+        if np.any(idx < 0):
             return -np.inf
 
-    # Start probability
-    start_idx = state_to_idx[seq[0]]
-    log_prob = np.log(start_probs[start_idx])
+        return float(self.log_start[idx[0]] + self.log_trans[idx[:-1], idx[1:]].sum())
+
+    def argmax_sequence(self, start_state: int, length: int) -> list[int]:
+        """
+        Generate the most likely sequence from a start state.
+
+        Args:
+            start_state: Starting state
+            length: Sequence length
+
+        Returns:
+            Most likely sequence
+
+        Raises:
+            ValueError: If start_state is unknown or length < 1
+        """
+        if length < 1:
+            raise ValueError(f"Length must be positive, got {length}")
+
+        if start_state not in self.state_to_idx:
+            raise ValueError(f"Start state {start_state} not found in states")
+
+        path = argmax_path(self.next_idx_of, self.state_to_idx[start_state], length)
+        return self.to_states(path)
+
+    def to_indices(self, seq: list[int]) -> np.ndarray:
+        """
+        Map state values to state indices through the lookup table.
+
+        Args:
+            seq: State values
+
+        Returns:
+            Array of state indices, with -1 for values that are not states
+        """
+        offsets = np.asarray(seq, dtype=np.int64) - self.lut_offset
+        known = (offsets >= 0) & (offsets < len(self.idx_lut))
+        idx = np.full(len(offsets), -1, dtype=np.int64)
+        idx[known] = self.idx_lut[offsets[known]]
+        return idx
+
+    def to_states(self, path: Union[np.ndarray, list[int]]) -> list[int]:
+        """
+        Map a path of state indices back to state values.
 
-    # Transition probabilities
-    for i in range(len(seq) - 1):
-        current_idx = state_to_idx[seq[i]]
-        next_idx = state_to_idx[seq[i + 1]]
-        log_prob += np.log(trans_mat[current_idx, next_idx])
+        Args:
+            path: State indices
 
-    return log_prob
+        Returns:
+            Corresponding state values
+        """
+        states: list[int] = self.states_arr[path].tolist()
+        return states
+
+
+def fit_chain(sequences: list[list[int]], alpha: float = 1.0) -> FittedChain:
+    """
+    Fit a smoothed Markov chain to sequences.
+
+    Args:
+        sequences: List of sequences
+        alpha: Dirichlet smoothing parameter (must be > 0)
+
+    Returns:
+        FittedChain for the observed states
+
+    Raises:
+        ValueError: If no sequences provided or alpha <= 0
+    """
+    counts_dense, states = build_transition_counts_dense(sequences)
+    trans = transition_matrix_from_dense(counts_dense, alpha=alpha)
+    start_probs = empirical_start_distribution(sequences, states, alpha=alpha)
+    return FittedChain.from_matrices(states, trans, start_probs)
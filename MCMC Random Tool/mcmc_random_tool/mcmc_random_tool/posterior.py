@@ -1,14 +1,25 @@
 """Posterior sampling for Markov chain models."""
 
 import logging
-from typing import Optional
+from typing import Optional, Union
 
 import numpy as np
 
-from .model import build_transition_counts, logprob_of_sequence, sample_sequence
+from ._parallel import map_chunks
+from .model import (
+    build_transition_counts,
+    check_stochastic,
+    cumulative_distribution,
+    dense_transition_counts,
+    logprob_of_paths,
+    sample_paths_from_uniforms,
+)
 
 logger = logging.getLogger(__name__)
 
+# Number of posterior transition matrices held in memory at once
+_PREDICTIVE_BLOCK_SIZE = 4096
+
 
 def dirichlet_sample_row(
     alpha_vec: np.ndarray,
@@ -30,14 +41,68 @@ def dirichlet_sample_row(
     if np.any(alpha_vec < 0):
         raise ValueError("Alpha parameters must be non-negative")
 
-    # Handle edge case where all alphas are zero
-    if np.all(alpha_vec == 0):
-        n = len(alpha_vec)
-        return np.ones(n) / n
+    return _dirichlet_sample_rows(alpha_vec, rng)
+
+
+def _dirichlet_sample_rows(
+    alpha_mat: np.ndarray,
+    rng: np.random.Generator,
+    out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Sample independent Dirichlet rows along the last axis in one Gamma draw.
+
+    Rows whose Gamma variates sum to zero, e.g. all-zero concentrations,
+    fall back to the uniform distribution.
+
+    Args:
+        alpha_mat: Concentration parameters, one row per last-axis slice
+        rng: Random number generator
+        out: Optional C-contiguous float64 array with the shape of
+            alpha_mat to draw and normalize into
+
+    Returns:
+        Sampled probabilities with the shape of alpha_mat
+    """
+    rows: np.ndarray = rng.standard_gamma(alpha_mat, out=out)
+    sums = rows.sum(axis=-1, keepdims=True)
+    np.divide(rows, sums, out=rows, where=sums > 0)
+    rows[np.broadcast_to(sums == 0, rows.shape)] = 1.0 / rows.shape[-1]
+    return rows
+
 
-    # Sample from Dirichlet distribution
-    samples = rng.gamma(alpha_vec, 1.0)
-    return samples / samples.sum()
+def sample_transition_matrix_from_counts(
+    counts_dense: np.ndarray,
+    alpha: float = 1.0,
+    rng: Optional[np.random.Generator] = None
+) -> np.ndarray:
+    """
+    Sample a transition matrix from the posterior given dense counts.
+
+    Args:
+        counts_dense: Transition count matrix with shape (n_states, n_states)
+        alpha: Dirichlet concentration parameter (must be > 0)
+        rng: Random number generator
+
+    Returns:
+        Sampled transition matrix
+
+    Raises:
+        ValueError: If alpha <= 0
+    """
+    if alpha <= 0:
+        raise ValueError(f"Alpha must be positive, got {alpha}")
+
+    if rng is None:
+        rng = np.random.default_rng()
+
+    # Sample every row from its Dirichlet posterior in one Gamma draw
+    trans_mat = _dirichlet_sample_rows(counts_dense + alpha, rng)
+
+    check_stochastic(trans_mat, "sampled transition probabilities")
+
+    logger.info(f"Sampled transition matrix from posterior with alpha={alpha}")
+    return trans_mat
 
 
 def sample_transition_matrix_posterior(
@@ -49,6 +114,10 @@ def sample_transition_matrix_posterior(
     """
     Sample a transition matrix from the posterior distribution.
 
+    Compatibility wrapper that counts transitions in the training sequences
+    on every call. Callers sampling repeatedly should build the counts once
+    and use sample_transition_matrix_from_counts.
+
     Args:
         sequences: Training sequences
         states: List of state values
@@ -67,68 +136,98 @@ def sample_transition_matrix_posterior(
     if not sequences:
         raise ValueError("No sequences provided")
 
-    if rng is None:
-        rng = np.random.default_rng()
-
-    # Build transition counts
     counts, _ = build_transition_counts(sequences)
+    return sample_transition_matrix_from_counts(
+        dense_transition_counts(counts, states), alpha=alpha, rng=rng
+    )
 
-    n = len(states)
-    state_to_idx = {state: i for i, state in enumerate(states)}
-    trans_mat = np.zeros((n, n), dtype=np.float64)
-
-    # Sample each row from Dirichlet posterior
-    for i, state in enumerate(states):
-        if state in counts:
-            # Get counts for this state
-            state_counts = counts[state]
-            alpha_vec = np.full(n, alpha, dtype=np.float64)
-
-            for next_state, count in state_counts.items():
-                if next_state in state_to_idx:
-                    j = state_to_idx[next_state]
-                    alpha_vec[j] += count
-
-            # Sample row from Dirichlet posterior
-            trans_mat[i] = dirichlet_sample_row(alpha_vec, rng)
-        else:
-            # No transitions from this state, use uniform distribution
-            trans_mat[i] = dirichlet_sample_row(np.full(n, alpha), rng)
-
-    # Ensure numeric stability
-    assert np.all(trans_mat >= 0), "Negative probabilities in sampled matrix"
-    assert np.allclose(trans_mat.sum(axis=1), 1.0), "Sampled matrix rows do not sum to 1"
 
-    logger.info(f"Sampled transition matrix from posterior with alpha={alpha}")
-    return trans_mat
+def _predictive_paths(
+    counts_dense: np.ndarray,
+    start_probs: np.ndarray,
+    alpha: float,
+    length: int,
+    nsamples: int,
+    rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+    """Sample posterior predictive paths and their log-probabilities."""
+    n = counts_dense.shape[0]
+
+    # Uniforms for every chain are drawn first so the Gamma stream below is
+    # consumed identically whatever the block size
+    u = rng.random((nsamples, length))
+    cdf_start = cumulative_distribution(start_probs)
+    alpha_mat = counts_dense + alpha
+    paths = np.empty((nsamples, length), dtype=np.int64)
+    lps = np.empty(nsamples, dtype=np.float64)
+
+    # Draw posterior matrices in fixed-size blocks to bound memory, reusing
+    # the same matrix and CDF buffers for every block
+    block = min(_PREDICTIVE_BLOCK_SIZE, nsamples)
+    trans_buf = np.empty((block, n, n), dtype=np.float64)
+    cdf_buf = np.empty_like(trans_buf)
+    for lo in range(0, nsamples, block):
+        hi = min(lo + block, nsamples)
+        trans_mats = _dirichlet_sample_rows(
+            np.broadcast_to(alpha_mat, (hi - lo, n, n)), rng, out=trans_buf[:hi - lo]
+        )
 
+        paths[lo:hi] = sample_paths_from_uniforms(
+            cumulative_distribution(trans_mats, out=cdf_buf[:hi - lo]), cdf_start, u[lo:hi]
+        )
+        lps[lo:hi] = logprob_of_paths(paths[lo:hi], start_probs, trans_mats)
 
-def posterior_predictive_sequences(
-    sequences: list[list[int]],
+    return paths, lps
+
+
+def _predictive_paths_chunk(
+    counts_dense: np.ndarray,
+    start_probs: np.ndarray,
+    alpha: float,
+    length: int,
+    nsamples: int,
+    seed: np.random.SeedSequence
+) -> tuple[np.ndarray, np.ndarray]:
+    """Worker-process entry point for _predictive_paths."""
+    return _predictive_paths(
+        counts_dense, start_probs, alpha, length, nsamples,
+        np.random.default_rng(seed)
+    )
+
+
+def posterior_predictive_from_counts(
+    counts_dense: np.ndarray,
     states: list[int],
     start_probs: np.ndarray,
     alpha: float = 1.0,
     length: int = 7,
     nsamples: int = 1000,
-    rng: Optional[np.random.Generator] = None
-) -> list[tuple[list[int], float]]:
+    rng: Optional[np.random.Generator] = None,
+    n_jobs: int = 1,
+    as_list: bool = True
+) -> Union[list[tuple[list[int], float]], tuple[np.ndarray, np.ndarray]]:
     """
-    Generate posterior predictive sequences.
+    Generate posterior predictive sequences given dense transition counts.
 
     Args:
-        sequences: Training sequences
+        counts_dense: Transition count matrix with shape (n_states, n_states)
         states: List of state values
         start_probs: Start state probabilities
         alpha: Dirichlet concentration parameter (must be > 0)
         length: Sequence length to generate
         nsamples: Number of posterior samples
         rng: Random number generator
+        n_jobs: Number of worker processes; 1 samples in-process
+        as_list: Return a list of tuples rather than arrays
 
     Returns:
-        List of (sequence, log_probability) tuples
+        List of (sequence, log_probability) tuples, or with as_list=False
+        a tuple of (sequences, log_probabilities) arrays with shapes
+        (nsamples, length) and (nsamples,)
 
     Raises:
-        ValueError: If alpha <= 0, length < 1, or nsamples < 1
+        ValueError: If alpha <= 0, length < 1, nsamples < 1, n_jobs < 1 or
+            shapes mismatch
     """
     if alpha <= 0:
         raise ValueError(f"Alpha must be positive, got {alpha}")
@@ -139,28 +238,76 @@ def posterior_predictive_sequences(
     if nsamples < 1:
         raise ValueError(f"Number of samples must be positive, got {nsamples}")
 
+    if n_jobs < 1:
+        raise ValueError(f"Number of jobs must be positive, got {n_jobs}")
+
     if rng is None:
         rng = np.random.default_rng()
 
-    sims = []
+    n = len(states)
+    if len(start_probs) != n or counts_dense.shape != (n, n):
+        raise ValueError(f"Count matrix shape {counts_dense.shape} != ({n}, {n})")
 
-    for i in range(nsamples):
-        # Sample transition matrix from posterior
-        trans_mat = sample_transition_matrix_posterior(
-            sequences, states, alpha=alpha, rng=rng
+    if n_jobs == 1:
+        paths, lps = _predictive_paths(
+            counts_dense, start_probs, alpha, length, nsamples, rng
         )
-
-        # Sample sequence from this matrix
-        seq = sample_sequence(
-            states, start_probs, trans_mat, length=length, rng=rng
+    else:
+        chunks = map_chunks(
+            _predictive_paths_chunk, nsamples, n_jobs, rng,
+            counts_dense, start_probs, alpha, length
         )
+        paths = np.concatenate([c_paths for c_paths, _ in chunks])
+        lps = np.concatenate([c_lps for _, c_lps in chunks])
+
+    seqs = np.asarray(states, dtype=np.int64)[paths]
+    logger.info(f"Generated {nsamples} posterior predictive sequences")
 
-        # Compute log probability
-        lp = logprob_of_sequence(seq, states, start_probs, trans_mat)
-        sims.append((seq, lp))
+    if not as_list:
+        return seqs, lps
 
-        if (i + 1) % 100 == 0:
-            logger.info(f"Generated {i + 1}/{nsamples} posterior predictive sequences")
+    return list(zip(seqs.tolist(), lps.tolist()))
 
-    logger.info(f"Generated {len(sims)} posterior predictive sequences")
-    return sims
+
+def posterior_predictive_sequences(
+    sequences: list[list[int]],
+    states: list[int],
+    start_probs: np.ndarray,
+    alpha: float = 1.0,
+    length: int = 7,
+    nsamples: int = 1000,
+    rng: Optional[np.random.Generator] = None,
+    n_jobs: int = 1,
+    as_list: bool = True
+) -> Union[list[tuple[list[int], float]], tuple[np.ndarray, np.ndarray]]:
+    """
+    Generate posterior predictive sequences.
+
+    Compatibility wrapper around posterior_predictive_from_counts that
+    counts transitions in the training sequences first.
+
+    Args:
+        sequences: Training sequences
+        states: List of state values
+        start_probs: Start state probabilities
+        alpha: Dirichlet concentration parameter (must be > 0)
+        length: Sequence length to generate
+        nsamples: Number of posterior samples
+        rng: Random number generator
+        n_jobs: Number of worker processes; 1 samples in-process
+        as_list: Return a list of tuples rather than arrays
+
+    Returns:
+        List of (sequence, log_probability) tuples, or with as_list=False
+        a tuple of (sequences, log_probabilities) arrays with shapes
+        (nsamples, length) and (nsamples,)
+
+    Raises:
+        ValueError: If alpha <= 0, length < 1, nsamples < 1, or n_jobs < 1
+    """
+    counts, _ = build_transition_counts(sequences)
+    return posterior_predictive_from_counts(
+        dense_transition_counts(counts, states), states, start_probs,
+        alpha=alpha, length=length, nsamples=nsamples, rng=rng, n_jobs=n_jobs,
+        as_list=as_list
+    )
@@ -1,13 +1,42 @@
 """Visualization utilities for Markov chain analysis."""
 
 import logging
+from functools import cache
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
+from matplotlib.figure import Figure
 
 logger = logging.getLogger(__name__)
 
+# Above this many states the cell annotations are unreadable, so skip them
+_MAX_ANNOTATED_STATES = 20
+
+
+@cache
+def _figure(name: str, figsize: tuple[float, float]) -> Figure:
+    """
+    Return the figure reused by every call of one plot function.
+
+    Figures are created without pyplot, so no global figure manager is
+    involved and the figure and its canvas survive between calls.
+
+    Args:
+        name: Plot the figure belongs to
+        figsize: Figure size in inches
+
+    Returns:
+        Figure for the plot, holding whatever the previous call drew
+    """
+    return Figure(figsize=figsize)
+
+
+def _reset_figure(name: str, figsize: tuple[float, float]) -> Figure:
+    """Fetch the cached figure for a plot and clear its previous contents."""
+    fig = _figure(name, figsize)
+    fig.clear()
+    return fig
+
 
 def plot_frequency(
     counts_series: pd.Series,
@@ -20,15 +49,15 @@ def plot_frequency(
         counts_series: Pandas Series with state counts
         outpath: Output file path
     """
-    plt.figure(figsize=(12, 6))
-    counts_series.plot(kind='bar')
-    plt.title('State Frequency Distribution')
-    plt.xlabel('State')
-    plt.ylabel('Frequency')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig(outpath, dpi=300, bbox_inches='tight')
-    plt.close()
+    fig = _reset_figure("frequency", (12, 6))
+    ax = fig.add_subplot()
+    counts_series.plot(kind='bar', ax=ax)
+    ax.set_title('State Frequency Distribution')
+    ax.set_xlabel('State')
+    ax.set_ylabel('Frequency')
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+    fig.savefig(outpath, dpi=300, bbox_inches='tight')
     logger.info(f"Saved frequency plot to {outpath}")
 
 
@@ -45,24 +74,29 @@ def plot_heatmap(
         states: List of state values
         outpath: Output file path
     """
-    plt.figure(figsize=(10, 8))
-    im = plt.imshow(matrix, cmap='Blues', aspect='auto')
-    plt.colorbar(im, label='Transition Probability')
+    fig = _reset_figure("heatmap", (10, 8))
+    ax = fig.add_subplot()
+    im = ax.imshow(matrix, cmap='Blues', aspect='auto')
+    fig.colorbar(im, ax=ax, label='Transition Probability')
 
     # Set ticks
-    plt.xticks(range(len(states)), [str(s) for s in states])
-    plt.yticks(range(len(states)), [str(s) for s in states])
-    plt.xlabel('Next State')
-    plt.ylabel('Current State')
-    plt.title('Transition Matrix Heatmap')
-
-    # Add text annotations
-    for i in range(len(states)):
-        for j in range(len(states)):
-            plt.text(j, i, f'{matrix[i, j]:.3f}',
-                    ha="center", va="center", color="black" if matrix[i, j] < 0.5 else "white")
-
-    plt.tight_layout()
-    plt.savefig(outpath, dpi=300, bbox_inches='tight')
-    plt.close()
+    ax.set_xticks(range(len(states)), [str(s) for s in states])
+    ax.set_yticks(range(len(states)), [str(s) for s in states])
+    ax.set_xlabel('Next State')
+    ax.set_ylabel('Current State')
+    ax.set_title('Transition Matrix Heatmap')
+
+    # Add text annotations, with labels and colors computed for all cells at once
+    if len(states) <= _MAX_ANNOTATED_STATES:
+        rows, cols = np.indices(matrix.shape)
+        labels = np.char.mod('%.3f', matrix)
+        colors = np.where(matrix < 0.5, "black", "white")
+        for i, j, label, color in zip(
+            rows.ravel().tolist(), cols.ravel().tolist(),
+            labels.ravel().tolist(), colors.ravel().tolist()
+        ):
+            ax.text(j, i, label, ha="center", va="center", color=color)
+
+    fig.tight_layout()
+    fig.savefig(outpath, dpi=300, bbox_inches='tight')
     logger.info(f"Saved heatmap to {outpath}")
@@ -1,5 +1,6 @@
 """Tests for CLI module."""
 
+import csv
 import tempfile
 from pathlib import Path
 
@@ -119,6 +120,39 @@ def test_cli_topk_command():
 
             # Check that output file was created
             assert Path(output_file).exists()
+
+            # Check the ranking is written most probable first
+            with open(output_file, newline="") as f:
+                rows = list(csv.reader(f))
+            assert rows[0] == ["sequence", "count_in_samples", "log_prob", "probability"]
+            probs = [float(row[3]) for row in rows[1:]]
+            assert probs == sorted(probs, reverse=True)
+            assert sum(int(row[1]) for row in rows[1:]) == 10
+    finally:
+        Path(input_file).unlink()
+
+
+def test_cli_topk_command_parallel():
+    """Test topk command with multiple worker processes."""
+    with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
+        f.write("1,2,3,4,5\n")
+        f.write("2,3,4,5,6\n")
+        f.write("3,4,5,6,7\n")
+        input_file = f.name
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file = f"{temp_dir}/topk_output.csv"
+            result = main([
+                "topk",
+                "-i", input_file,
+                "--length", "3",
+                "-n", "10",
+                "-o", output_file,
+                "--jobs", "2"
+            ])
+            assert result == 0
+            assert Path(output_file).exists()
     finally:
         Path(input_file).unlink()
 
@@ -44,6 +44,20 @@ def test_parse_sequences_from_file_with_invalid_tokens():
         Path(temp_file).unlink()
 
 
+def test_parse_sequences_from_file_mixed_delimiters_and_signs():
+    """Test parsing mixed delimiters and signed tokens."""
+    with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
+        f.write("1, 2 ,3\t4\n")
+        f.write("+5,-6,7,,8\n")
+        temp_file = f.name
+
+    try:
+        sequences = parse_sequences_from_file(temp_file)
+        assert sequences == [[1, 2, 3, 4], [5, 7, 8]]  # -6 is out of range
+    finally:
+        Path(temp_file).unlink()
+
+
 def test_parse_sequences_from_file_with_out_of_range():
     """Test parsing file with out-of-range values."""
     with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
@@ -4,11 +4,22 @@ import numpy as np
 import pytest
 
 from mcmc_random_tool.model import (
+    FittedChain,
+    argmax_path,
     argmax_sequence,
     build_transition_counts,
+    build_transition_counts_dense,
+    check_stochastic,
+    cumulative_distribution,
+    dense_transition_counts,
     empirical_start_distribution,
+    fit_chain,
+    logprob_of_paths,
     logprob_of_sequence,
+    pad_sequences,
+    sample_path,
     sample_sequence,
+    sample_sequences_batch,
     transition_matrix_from_counts,
 )
 
@@ -40,6 +51,58 @@ def test_build_transition_counts_single_state():
     assert counts[1][1] == 3  # 1->1 appears 3 times
 
 
+def test_dense_transition_counts():
+    """Test scattering transition counts into a dense matrix."""
+    sequences = [[1, 2, 3], [2, 3, 1], [1, 2, 1]]
+    counts, states = build_transition_counts(sequences)
+    dense = dense_transition_counts(counts, states)
+
+    expected = np.array([
+        [0, 2, 0],
+        [1, 0, 2],
+        [1, 0, 0],
+    ])
+    assert np.array_equal(dense, expected)
+
+
+def test_build_transition_counts_dense():
+    """Test dense counts match the dict-based counts."""
+    sequences = [[1, 2, 3], [], [5], [2, 3, 1], [1, 2, 1], [3, 5]]
+    counts, states = build_transition_counts(sequences)
+    counts_dense, dense_states = build_transition_counts_dense(sequences)
+
+    assert dense_states == states == [1, 2, 3, 5]
+    assert counts_dense.dtype == np.int64
+    assert np.array_equal(counts_dense, dense_transition_counts(counts, states))
+    assert counts == {1: {2: 2}, 2: {3: 2, 1: 1}, 3: {1: 1, 5: 1}}
+
+
+def test_pad_sequences():
+    """Test packing sequences into a padded array."""
+    seqs_arr, lengths = pad_sequences([[1, 2, 3], [], [-4, 5]])
+
+    assert seqs_arr.dtype == np.int32
+    assert seqs_arr.tolist() == [[1, 2, 3], [-1, -1, -1], [-4, 5, -1]]
+    assert lengths.tolist() == [3, 0, 2]
+
+
+def test_build_transition_counts_dense_negative_states():
+    """Test dense counts do not confuse negative states with padding."""
+    counts_dense, states = build_transition_counts_dense([[-1, 2, -1], [2]])
+
+    assert states == [-1, 2]
+    assert counts_dense.tolist() == [[0, 1], [1, 0]]
+
+
+def test_build_transition_counts_dense_no_transitions():
+    """Test dense counts with no sequence long enough for a transition."""
+    with pytest.raises(ValueError, match="No sequences provided"):
+        build_transition_counts_dense([])
+
+    with pytest.raises(ValueError, match="No valid states found"):
+        build_transition_counts_dense([[1], [], [2]])
+
+
 def test_transition_matrix_from_counts():
     """Test building transition matrix from counts."""
     sequences = [[1, 2, 3], [2, 3, 1]]
@@ -56,6 +119,18 @@ def test_transition_matrix_from_counts():
     assert np.all(matrix >= 0)
 
 
+def test_transition_matrix_from_counts_values():
+    """Test smoothed transition probabilities against hand-computed values."""
+    sequences = [[1, 2, 3], [1, 2, 1]]
+    counts, states = build_transition_counts(sequences)
+    matrix = transition_matrix_from_counts(counts, states, alpha=1.0)
+
+    # State 1: 1->2 twice, total = 2 + 3 * alpha
+    assert np.allclose(matrix[0], [1 / 5, 3 / 5, 1 / 5])
+    # State 3 has no outgoing transitions, so its row is uniform
+    assert np.allclose(matrix[2], [1 / 3, 1 / 3, 1 / 3])
+
+
 def test_transition_matrix_from_counts_invalid_alpha():
     """Test transition matrix with invalid alpha."""
     sequences = [[1, 2, 3]]
@@ -68,6 +143,24 @@ def test_transition_matrix_from_counts_invalid_alpha():
         transition_matrix_from_counts(counts, states, alpha=-1.0)
 
 
+def test_check_stochastic_disabled_by_default():
+    """Test invariant checks are skipped unless validation is enabled."""
+    check_stochastic(np.array([[0.5, 0.6], [-0.1, 1.1]]))
+
+
+def test_check_stochastic_enabled(monkeypatch):
+    """Test invariant checks when validation is enabled."""
+    monkeypatch.setattr("mcmc_random_tool.model.VALIDATE", True)
+
+    check_stochastic(np.array([[0.5, 0.5], [0.1, 0.9]]))
+
+    with pytest.raises(AssertionError, match="Negative"):
+        check_stochastic(np.array([[1.1, -0.1]]))
+
+    with pytest.raises(AssertionError, match="do not sum to 1"):
+        check_stochastic(np.array([[0.5, 0.6]]))
+
+
 def test_empirical_start_distribution():
     """Test building start state distribution."""
     sequences = [[1, 2, 3], [2, 3, 1], [1, 2, 1]]
@@ -88,6 +181,17 @@ def test_empirical_start_distribution():
     assert start_probs[0] > start_probs[1]  # state 1 > state 2
 
 
+def test_empirical_start_distribution_counts():
+    """Test start counts with unsorted states, unknown and empty sequences."""
+    sequences = [[3, 1], [1, 2], [], [9, 1], [3], [0, 2]]
+    states = [3, 1, 2]
+    start_probs = empirical_start_distribution(sequences, states, alpha=0.5)
+
+    # Starts: 3 twice, 1 once; 9 and 0 are unknown
+    expected = (np.array([2.0, 1.0, 0.0]) + 0.5) / (3.0 + 0.5 * 3)
+    assert np.allclose(start_probs, expected)
+
+
 def test_empirical_start_distribution_invalid_alpha():
     """Test start distribution with invalid alpha."""
     sequences = [[1, 2, 3]]
@@ -111,6 +215,32 @@ def test_argmax_sequence():
     assert seq == [1, 2, 3, 1]  # Should follow the highest probability path
 
 
+def test_fitted_chain_argmax_sequence():
+    """Test the fitted chain's argmax sequence matches argmax_sequence."""
+    sequences = [[1, 2, 3, 1], [2, 3, 1, 2], [1, 2, 3]]
+    chain = fit_chain(sequences, alpha=1.0)
+
+    for start_state in chain.states:
+        assert chain.argmax_sequence(start_state, length=5) == argmax_sequence(
+            start_state, chain.states, chain.trans, length=5
+        )
+
+    with pytest.raises(ValueError, match="Start state.*not found"):
+        chain.argmax_sequence(7, length=3)
+
+
+def test_argmax_path_cycles():
+    """Test argmax paths that enter a cycle match a step-by-step walk."""
+    next_idx_of = np.array([1, 2, 3, 1, 4])
+
+    for start_idx in range(5):
+        for length in (1, 2, 5, 12):
+            expected = [start_idx]
+            for _ in range(length - 1):
+                expected.append(int(next_idx_of[expected[-1]]))
+            assert argmax_path(next_idx_of, start_idx, length) == expected
+
+
 def test_argmax_sequence_invalid_start():
     """Test argmax sequence with invalid start state."""
     states = [1, 2, 3]
@@ -146,6 +276,160 @@ def test_sample_sequence():
     assert all(state in states for state in seq)
 
 
+def test_sample_sequence_unnormalized_probabilities():
+    """Test sampling rejects probabilities that do not sum to 1."""
+    states = [1, 2, 3]
+    rng = np.random.default_rng(42)
+
+    with pytest.raises(ValueError, match="do not sum to 1"):
+        sample_sequence(states, np.full(3, 0.2), np.full((3, 3), 0.1), length=3, rng=rng)
+
+    with pytest.raises(ValueError, match="do not sum to 1"):
+        sample_sequence(states, np.full(3, 1 / 3), np.full((3, 3), 0.1), length=3, rng=rng)
+
+    with pytest.raises(ValueError, match="non-negative"):
+        sample_sequence(states, np.array([1.2, -0.2, 0.0]), np.eye(3), length=3, rng=rng)
+
+
+def test_cumulative_distribution():
+    """Test cumulative distribution rows end exactly at 1."""
+    trans_mat = np.array([
+        [0.1, 0.8, 0.1],
+        [0.1, 0.1, 0.8],
+        [0.8, 0.1, 0.1],
+    ])
+
+    cdf = cumulative_distribution(trans_mat)
+
+    assert cdf.shape == trans_mat.shape
+    assert np.allclose(cdf[:, 0], trans_mat[:, 0])
+    assert np.all(cdf[:, -1] == 1.0)
+
+
+def test_sample_path_follows_transitions():
+    """Test sampled paths only use transitions with positive probability."""
+    trans_mat = np.array([
+        [0.0, 1.0, 0.0],
+        [0.0, 0.0, 1.0],
+        [1.0, 0.0, 0.0],
+    ])
+    start_probs = np.array([1.0, 0.0, 0.0])
+    rng = np.random.default_rng(42)
+
+    path = sample_path(
+        cumulative_distribution(trans_mat),
+        cumulative_distribution(start_probs),
+        length=5,
+        rng=rng
+    )
+
+    assert path.tolist() == [0, 1, 2, 0, 1]
+
+
+def test_sample_sequences_batch_matches_sample_path():
+    """Test batch sampling consumes the RNG like repeated single paths."""
+    start_probs = np.array([0.5, 0.3, 0.2])
+    trans_mat = np.array([
+        [0.1, 0.8, 0.1],
+        [0.1, 0.1, 0.8],
+        [0.8, 0.1, 0.1],
+    ])
+    cdf_trans = cumulative_distribution(trans_mat)
+    cdf_start = cumulative_distribution(start_probs)
+
+    paths = sample_sequences_batch(20, cdf_trans, cdf_start, 6, np.random.default_rng(7))
+
+    rng = np.random.default_rng(7)
+    expected = [sample_path(cdf_trans, cdf_start, 6, rng).tolist() for _ in range(20)]
+
+    assert paths.shape == (20, 6)
+    assert paths.tolist() == expected
+
+
+def test_sample_sequences_batch_per_chain_matrices():
+    """Test batch sampling with a separate transition matrix per chain."""
+    forward = np.roll(np.eye(3), 1, axis=1)  # i -> i + 1
+    backward = np.roll(np.eye(3), -1, axis=1)  # i -> i - 1
+    trans_mats = np.stack([forward, backward])
+    start_probs = np.array([1.0, 0.0, 0.0])
+
+    paths = sample_sequences_batch(
+        2,
+        cumulative_distribution(trans_mats),
+        cumulative_distribution(start_probs),
+        4,
+        np.random.default_rng(42)
+    )
+
+    assert paths.tolist() == [[0, 1, 2, 0], [0, 2, 1, 0]]
+    assert np.all(logprob_of_paths(paths, start_probs, trans_mats) == 0.0)
+
+
+def _batch_cases():
+    """Shared and per-chain transition matrices for batch sampler tests."""
+    trans_mat = np.array([
+        [0.1, 0.8, 0.1],
+        [0.1, 0.1, 0.8],
+        [0.8, 0.1, 0.1],
+    ])
+    trans_mats = np.stack([trans_mat, trans_mat.T / trans_mat.T.sum(axis=1, keepdims=True)] * 5)
+    cdf_start = cumulative_distribution(np.array([0.5, 0.3, 0.2]))
+    return [(cumulative_distribution(m), cdf_start) for m in (trans_mat, trans_mats)]
+
+
+def test_sample_sequences_batch_numpy_fallback(monkeypatch):
+    """Test the NumPy sampler agrees with sequential single-path sampling."""
+    monkeypatch.setattr("mcmc_random_tool.model._numba_kernels", lambda: None)
+    cdf_trans, cdf_start = _batch_cases()[0]
+
+    paths = sample_sequences_batch(10, cdf_trans, cdf_start, 6, np.random.default_rng(3))
+
+    rng = np.random.default_rng(3)
+    expected = [sample_path(cdf_trans, cdf_start, 6, rng).tolist() for _ in range(10)]
+    assert paths.tolist() == expected
+
+
+@pytest.mark.parametrize("parallel_min_chains", [1, 10**9])
+def test_sample_sequences_batch_numba_matches_numpy(monkeypatch, parallel_min_chains):
+    """Test the compiled kernels return the same paths as the NumPy fallback."""
+    pytest.importorskip("numba")
+    monkeypatch.setattr(
+        "mcmc_random_tool._kernels.PARALLEL_MIN_CHAINS", parallel_min_chains
+    )
+
+    for cdf_trans, cdf_start in _batch_cases():
+        compiled = sample_sequences_batch(
+            10, cdf_trans, cdf_start, 6, np.random.default_rng(3)
+        )
+        with monkeypatch.context() as m:
+            m.setattr("mcmc_random_tool.model._numba_kernels", lambda: None)
+            fallback = sample_sequences_batch(
+                10, cdf_trans, cdf_start, 6, np.random.default_rng(3)
+            )
+        assert np.array_equal(compiled, fallback)
+
+
+def test_fitted_chain_logprob_numba_matches_numpy(monkeypatch):
+    """Test the compiled log-probability kernel against the NumPy fallback."""
+    pytest.importorskip("numba")
+    chain = fit_chain([[1, 2, 3, 1], [2, 3, 1, 2], [1, 2, 1, 3]], alpha=0.5)
+    paths = chain.sample_paths(20, 12, np.random.default_rng(5))
+
+    compiled = chain.logprob_of_paths(paths)
+    with monkeypatch.context() as m:
+        m.setattr("mcmc_random_tool.model._numba_kernels", lambda: None)
+        fallback = chain.logprob_of_paths(paths)
+    assert np.allclose(compiled, fallback)
+
+
+def test_sample_sequences_batch_invalid_length():
+    """Test batch sampling with invalid length."""
+    cdf = cumulative_distribution(np.eye(3))
+
+    with pytest.raises(ValueError, match="Length must be positive"):
+        sample_sequences_batch(5, cdf, cdf[0], 0, np.random.default_rng(42))
+
+
 def test_sample_sequence_invalid_length():
     """Test sampling sequence with invalid length."""
     states = [1, 2, 3]
@@ -180,3 +464,104 @@ def test_logprob_of_sequence():
     # Test empty sequence
     lp_empty = logprob_of_sequence([], states, start_probs, trans_mat)
     assert lp_empty == 0.0
+
+
+def test_logprob_of_sequence_unsorted_states():
+    """Test log probability with states not given in sorted order."""
+    states = [3, 5, 1]
+    start_probs = np.array([0.2, 0.3, 0.5])
+    trans_mat = np.array([
+        [0.1, 0.9, 0.0],
+        [0.5, 0.25, 0.25],
+        [0.3, 0.3, 0.4],
+    ])
+
+    lp = logprob_of_sequence([5, 1, 3], states, start_probs, trans_mat)
+    assert np.isclose(lp, np.log(0.3 * 0.25 * 0.3))
+    assert logprob_of_sequence([3, 1], states, start_probs, trans_mat) == -np.inf
+    assert logprob_of_sequence([5, 7], states, start_probs, trans_mat) == -np.inf
+    assert logprob_of_sequence([9], states, start_probs, trans_mat) == -np.inf
+
+
+def test_logprob_of_paths_matches_logprob_of_sequence():
+    """Test vectorized path log probabilities against the scalar version."""
+    states = [1, 2, 3]
+    start_probs = np.array([0.5, 0.3, 0.2])
+    trans_mat = np.array([
+        [0.1, 0.8, 0.1],
+        [0.1, 0.1, 0.8],
+        [0.8, 0.1, 0.1],
+    ])
+    paths = np.array([[0, 1, 2], [2, 0, 0], [1, 1, 2]])
+
+    lps = logprob_of_paths(paths, start_probs, trans_mat)
+
+    expected = [
+        logprob_of_sequence([states[i] for i in path], states, start_probs, trans_mat)
+        for path in paths
+    ]
+    assert np.allclose(lps, expected)
+
+
+def test_fit_chain():
+    """Test fitting a chain precomputes consistent derived arrays."""
+    sequences = [[1, 2, 3], [2, 3, 1], [1, 2, 1]]
+    chain = fit_chain(sequences, alpha=1.0)
+
+    assert chain.states == [1, 2, 3]
+    assert chain.state_to_idx == {1: 0, 2: 1, 3: 2}
+    assert np.allclose(chain.log_trans, np.log(chain.trans))
+    assert np.allclose(chain.log_start, np.log(chain.start_probs))
+    assert np.all(chain.cdf_trans[:, -1] == 1.0)
+
+    paths = chain.sample_paths(10, 4, np.random.default_rng(42))
+    expected = logprob_of_paths(paths, chain.start_probs, chain.trans)
+    assert np.allclose(chain.logprob_of_paths(paths), expected)
+    assert chain.to_states(paths[0]) == [chain.states[i] for i in paths[0]]
+    assert chain.to_states([2, 0]) == [3, 1]
+
+
+def test_fitted_chain_logprob_of_sequence():
+    """Test chain log probabilities from the cached log matrices."""
+    states = [1, 2, 3]
+    start_probs = np.array([0.5, 0.5, 0.0])
+    trans_mat = np.array([
+        [0.1, 0.8, 0.1],
+        [0.1, 0.1, 0.8],
+        [0.8, 0.2, 0.0],
+    ])
+    chain = FittedChain.from_matrices(states, trans_mat, start_probs)
+
+    for seq in ([1, 2, 3], [2, 3, 1, 1], [3, 1], [1, 3, 3]):
+        expected = logprob_of_sequence(seq, states, start_probs, trans_mat)
+        assert chain.logprob_of_sequence(seq) == expected
+
+    assert chain.logprob_of_sequence([1, 5]) == -np.inf
+    assert chain.logprob_of_sequence([0, 1]) == -np.inf
+    assert chain.logprob_of_sequence([]) == 0.0
+
+
+def test_fitted_chain_to_indices():
+    """Test the state lookup table with gaps and unknown values."""
+    chain = fit_chain([[4, 7, 9], [7, 4, 4]])
+
+    assert chain.states == [4, 7, 9]
+    idx = chain.to_indices([9, 4, 7, 5, 3, 10, -2])
+    assert idx.tolist() == [2, 0, 1, -1, -1, -1, -1]
+
+
+def test_fitted_chain_identity_semantics():
+    """Test fitted chains compare and hash by identity."""
+    sequences = [[1, 2, 3], [2, 3, 1]]
+    chain1 = fit_chain(sequences)
+    chain2 = fit_chain(sequences)
+
+    assert chain1 == chain1
+    assert chain1 != chain2
+    assert len({chain1, chain2}) == 2
+
+
+def test_fitted_chain_shape_mismatch():
+    """Test building a chain from mismatched matrices."""
+    with pytest.raises(ValueError, match="Transition matrix shape"):
+        FittedChain.from_matrices([1, 2, 3], np.eye(2), np.array([0.5, 0.3, 0.2]))
@@ -3,9 +3,13 @@
 import numpy as np
 import pytest
 
+from mcmc_random_tool.model import build_transition_counts, dense_transition_counts
 from mcmc_random_tool.posterior import (
+    _dirichlet_sample_rows,
     dirichlet_sample_row,
+    posterior_predictive_from_counts,
     posterior_predictive_sequences,
+    sample_transition_matrix_from_counts,
     sample_transition_matrix_posterior,
 )
 
@@ -48,6 +52,24 @@ def test_dirichlet_sample_row_zero_sum():
     assert np.allclose(result, expected)
 
 
+def test_dirichlet_sample_rows_zero_row():
+    """Test batched Dirichlet rows fall back to uniform for all-zero rows."""
+    alpha_mat = np.array([
+        [0.0, 0.0, 0.0],
+        [2.0, 1.0, 0.5],
+        [0.0, 3.0, 0.0],
+    ])
+
+    rows = _dirichlet_sample_rows(alpha_mat, np.random.default_rng(42))
+
+    assert np.allclose(rows[0], 1 / 3)
+    assert np.allclose(rows.sum(axis=1), 1.0)
+    assert np.array_equal(rows[2], [0.0, 1.0, 0.0])
+
+    expected = dirichlet_sample_row(alpha_mat[1], np.random.default_rng(7))
+    assert np.array_equal(_dirichlet_sample_rows(alpha_mat[1], np.random.default_rng(7)), expected)
+
+
 def test_sample_transition_matrix_posterior():
     """Test sampling transition matrix from posterior."""
     sequences = [[1, 2, 3], [2, 3, 1], [1, 2, 1]]
@@ -188,3 +210,129 @@ def test_posterior_predictive_sequences_reproducibility():
     for (seq1, lp1), (seq2, lp2) in zip(sims1, sims2):
         assert seq1 == seq2
         assert np.isclose(lp1, lp2)
+
+
+def test_sample_transition_matrix_from_counts_matches_wrapper():
+    """Test counts-based posterior sampling matches the sequence wrapper."""
+    sequences = [[1, 2, 3], [2, 3, 1]]
+    counts, states = build_transition_counts(sequences)
+    counts_dense = dense_transition_counts(counts, states)
+
+    matrix1 = sample_transition_matrix_from_counts(
+        counts_dense, alpha=1.0, rng=np.random.default_rng(42)
+    )
+    matrix2 = sample_transition_matrix_posterior(
+        sequences, states, alpha=1.0, rng=np.random.default_rng(42)
+    )
+
+    assert np.array_equal(matrix1, matrix2)
+
+
+def test_posterior_predictive_from_counts_matches_wrapper():
+    """Test counts-based posterior predictive matches the sequence wrapper."""
+    sequences = [[1, 2, 3], [2, 3, 1]]
+    counts, states = build_transition_counts(sequences)
+    start_probs = np.array([0.5, 0.3, 0.2])
+
+    sims1 = posterior_predictive_from_counts(
+        dense_transition_counts(counts, states), states, start_probs,
+        alpha=1.0, length=4, nsamples=8, rng=np.random.default_rng(42)
+    )
+    sims2 = posterior_predictive_sequences(
+        sequences, states, start_probs,
+        alpha=1.0, length=4, nsamples=8, rng=np.random.default_rng(42)
+    )
+
+    assert sims1 == sims2
+
+
+def test_posterior_predictive_from_counts_shape_mismatch():
+    """Test posterior predictive with counts that do not match the states."""
+    with pytest.raises(ValueError, match="Count matrix shape"):
+        posterior_predictive_from_counts(
+            np.zeros((2, 2)), [1, 2, 3], np.array([0.5, 0.3, 0.2]),
+            alpha=1.0, length=3, nsamples=5, rng=np.random.default_rng(42)
+        )
+
+
+def test_posterior_predictive_blocked_matches_single_block(monkeypatch):
+    """Test block-wise posterior draws reproduce a single-block draw."""
+    sequences = [[1, 2, 3], [2, 3, 1], [1, 2, 1]]
+    states = [1, 2, 3]
+    start_probs = np.array([0.5, 0.3, 0.2])
+
+    single = posterior_predictive_sequences(
+        sequences, states, start_probs,
+        alpha=1.0, length=4, nsamples=10, rng=np.random.default_rng(42)
+    )
+
+    monkeypatch.setattr("mcmc_random_tool.posterior._PREDICTIVE_BLOCK_SIZE", 3)
+    blocked = posterior_predictive_sequences(
+        sequences, states, start_probs,
+        alpha=1.0, length=4, nsamples=10, rng=np.random.default_rng(42)
+    )
+
+    assert blocked == single
+
+
+def test_posterior_predictive_sequences_parallel():
+    """Test posterior predictive sampling across worker processes."""
+    sequences = [[1, 2, 3], [2, 3, 1], [1, 2, 1]]
+    states = [1, 2, 3]
+    start_probs = np.array([0.5, 0.3, 0.2])
+
+    sims1 = posterior_predictive_sequences(
+        sequences, states, start_probs,
+        alpha=1.0, length=4, nsamples=11, rng=np.random.default_rng(42), n_jobs=2
+    )
+    sims2 = posterior_predictive_sequences(
+        sequences, states, start_probs,
+        alpha=1.0, length=4, nsamples=11, rng=np.random.default_rng(42), n_jobs=2
+    )
+
+    assert len(sims1) == 11
+    assert sims1 == sims2
+    for seq, lp in sims1:
+        assert len(seq) == 4
+        assert all(s in states for s in seq)
+        assert np.isfinite(lp)
+
+
+def test_posterior_predictive_sequences_invalid_n_jobs():
+    """Test posterior predictive with invalid number of jobs."""
+    with pytest.raises(ValueError, match="Number of jobs must be positive"):
+        posterior_predictive_sequences(
+            [[1, 2, 3]], [1, 2, 3], np.array([0.5, 0.3, 0.2]),
+            alpha=1.0, length=3, nsamples=5, rng=np.random.default_rng(42), n_jobs=0
+        )
+
+
+def test_posterior_predictive_sequences_more_jobs_than_samples():
+    """Test posterior predictive with more workers than samples."""
+    sims = posterior_predictive_sequences(
+        [[1, 2, 3], [2, 3, 1]], [1, 2, 3], np.array([0.5, 0.3, 0.2]),
+        alpha=1.0, length=3, nsamples=2, rng=np.random.default_rng(42), n_jobs=4
+    )
+
+    assert len(sims) == 2
+    assert all(len(seq) == 3 for seq, _ in sims)
+
+
+def test_posterior_predictive_sequences_as_arrays():
+    """Test posterior predictive sampling returning arrays."""
+    sequences = [[1, 2, 3], [2, 3, 1], [1, 2, 1]]
+    states = [1, 2, 3]
+    start_probs = np.array([0.5, 0.3, 0.2])
+
+    sims = posterior_predictive_sequences(
+        sequences, states, start_probs,
+        alpha=1.0, length=4, nsamples=6, rng=np.random.default_rng(42)
+    )
+    seqs, lps = posterior_predictive_sequences(
+        sequences, states, start_probs,
+        alpha=1.0, length=4, nsamples=6, rng=np.random.default_rng(42), as_list=False
+    )
+
+    assert seqs.shape == (6, 4)
+    assert lps.shape == (6,)
+    assert sims == list(zip(seqs.tolist(), lps.tolist()))